@@ -1,14 +1,16 @@
 import asyncio
+import json
 import logging
+import time
+from pathlib import Path
+from typing import Dict
 
 import click
-from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 
-from slackapp.start import app
-from slackapp.utils.assistant import load_assistant
+from slackapp.utils.encoding import MESSAGES_PER_ENTRY
 from slackapp.utils.logging import configure_logger
-
-configure_logger()
+from slackapp.utils.readiness import clear_ready, signal_ready
+from slackapp.utils.tracing import configure_tracing, shutdown_tracing
 
 log = logging.getLogger("slackapp")
 
@@ -20,17 +22,89 @@ def rocket() -> None:
 
 @rocket.command()
 def start() -> None:
+    # Logging and tracing need the app's environment, so only commands running the app
+    # set them up
+    configure_logger()
+    configure_tracing()
+
+    # A readiness file left by a previous run must not report this one as ready
+    clear_ready()
+
+    # Heavy imports are deferred until a command needs them, to keep CLI startup fast
+    import_start = time.perf_counter()
+    from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+    from slackapp.start import app
+    from slackapp.utils.memory import install_diagnostics, watch_memory_budget
+    from slackapp.utils.tasks import supervisor
+    from slackapp.utils.warmup import close_session, warm_up
+
+    log.info(f"Imports done in {time.perf_counter() - import_start:.2f}s")
+
     async def async_start() -> None:
         log.info("Starting the Slack app")
-        assistant = await load_assistant()
-        assert assistant.config.interfaces.slack is not None
-        assert assistant.config.interfaces.slack.tokens is not None
-        handler = AsyncSocketModeHandler(
-            app, assistant.config.interfaces.slack.tokens.app_token
-        )
-        await handler.start_async()
+        install_diagnostics()
+        supervisor.spawn(watch_memory_budget(), name="memory_watcher", bounded=False)
 
-    asyncio.run(async_start())
+        try:
+            # Warm up before connecting, so the first events find warm caches
+            assistant = await warm_up(app.client)
+            assert assistant.config.interfaces.slack is not None
+            assert assistant.config.interfaces.slack.tokens is not None
+            handler = AsyncSocketModeHandler(
+                app, assistant.config.interfaces.slack.tokens.app_token
+            )
+            await handler.connect_async()
+            signal_ready()
+            await asyncio.sleep(float("inf"))
+        finally:
+            # Cancel background work, such as pending error notices, before exiting
+            await supervisor.shutdown()
+            await close_session(app.client)
+
+    try:
+        asyncio.run(async_start())
+    finally:
+        clear_ready()
+        shutdown_tracing()
+
+
+@rocket.command("measure-encoding")
+@click.argument("export", type=click.Path(exists=True, path_type=Path))
+@click.option("--users", type=click.Path(exists=True, path_type=Path), default=None)
+@click.option("--channel", default=None, help="Channel name, defaults to the folder.")
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=MESSAGES_PER_ENTRY,
+    show_default=True,
+    help="Messages per entry in the batched encoding.",
+)
+def measure_encoding(
+    export: Path, users: Path | None, channel: str | None, batch_size: int
+) -> None:
+    """
+    Compare payload bytes and estimated tokens of the legacy and compact message
+    encodings on a Slack export: a day file or a channel folder of day files.
+    """
+    from slackapp.utils.encoding import load_export, measure_encodings
+
+    user_names: Dict[str, str] = {}
+    if users is not None:
+        for user in json.loads(users.read_text(encoding="utf-8")):
+            user_names[user["id"]] = user.get("real_name") or user["name"]
+
+    channel_name = channel or (export.name if export.is_dir() else export.parent.name)
+    messages = load_export(export)
+    results = measure_encodings(messages, channel_name, user_names, batch_size)
+
+    click.echo(f"{len(messages)} messages from {channel_name}")
+    legacy_bytes, legacy_tokens = results["legacy"]
+    for name, (size, tokens) in results.items():
+        click.echo(
+            f"{name:>16}: {size:>10} bytes ({size / max(legacy_bytes, 1):6.1%})"
+            f" {tokens:>9} tokens ({tokens / max(legacy_tokens, 1):6.1%})"
+        )
 
 
 if __name__ == "__main__":
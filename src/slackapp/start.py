@@ -9,7 +9,9 @@ from slack_sdk.web.async_client import AsyncWebClient
 
 from slackapp.utils.assistant import learn_message, load_assistant, reply_to_message
 from slackapp.utils.errors import SlackAppError
+from slackapp.utils.replies import invalidate_channel
 from slackapp.utils.slack import get_bot_user_id, learn_channel_history_on_join
+from slackapp.utils.tracing import span, traced_event
 
 # Initialize the Slack AsyncApp with environment variables
 app = AsyncApp(
@@ -20,6 +22,7 @@ log = logging.getLogger("slackapp")
 
 
 @app.event("app_mention")
+@traced_event("app_mention")
 async def mention_event(
     client: AsyncWebClient,
     event: Dict[str, Any],
@@ -37,19 +40,22 @@ async def mention_event(
     """
     try:
         await ack()
-        await say("...")
+        with span("slack.chat_postMessage"):
+            await say("...")
         reply = await reply_to_message(
             client=client,
             message=event["text"],
             user=event["user"],
             channel_id=event["channel"],
         )
-        await say(reply)
+        with span("slack.chat_postMessage"):
+            await say(reply)
     except Exception as e:
         raise SlackAppError(message=str(e), client=client, channel_id=event["channel"])
 
 
 @app.event("message")
+@traced_event("message")
 async def message(
     client: AsyncWebClient,
     event: Dict[str, Any],
@@ -94,7 +100,8 @@ async def message(
 
         # Reply to direct messages
         if event.get("channel_type") == "im":
-            await say("...")
+            with span("slack.chat_postMessage"):
+                await say("...")
             response = await reply_to_message(
                 client=client,
                 message=message,
@@ -103,7 +110,8 @@ async def message(
             )
             if event.get("files"):
                 response += "\nAlso, I see that you attached some files, but I'm not able to process them yet."
-            await say(response)
+            with span("slack.chat_postMessage"):
+                await say(response)
             return
 
         # All other messages add to assistant memory
@@ -120,6 +128,7 @@ async def message(
 
 
 @app.event("app_home_opened")
+@traced_event("app_home_opened")
 async def update_home_tab(client: AsyncWebClient, event: Dict[str, Any]) -> None:
     """
     Update the home tab with helpful information.
@@ -143,15 +152,17 @@ async def update_home_tab(client: AsyncWebClient, event: Dict[str, Any]) -> None
                 },
             ],
         )
-        await client.views_publish(
-            user_id=event["user"],
-            view=view.to_dict(),
-        )
+        with span("slack.views_publish"):
+            await client.views_publish(
+                user_id=event["user"],
+                view=view.to_dict(),
+            )
     except Exception as e:
         raise SlackAppError(message=str(e))
 
 
 @app.command("/test")
+@traced_event("test")
 async def hello_command(
     ack: AsyncAck,
     say: AsyncSay,
@@ -166,12 +177,14 @@ async def hello_command(
     """
     try:
         await ack()
-        await say("Testing, testing, 1, 2, 3!")
+        with span("slack.chat_postMessage"):
+            await say("Testing, testing, 1, 2, 3!")
     except Exception as e:
         raise SlackAppError(message=str(e))
 
 
 @app.event("member_joined_channel")
+@traced_event("member_joined_channel")
 async def member_join(
     client: AsyncWebClient, event: Dict[str, Any], ack: AsyncAck
 ) -> None:
@@ -196,10 +209,11 @@ async def member_join(
             # Say hello and learn the channel's message history
             assistant = await load_assistant()
             assert assistant.config.interfaces.slack is not None  # keep mypy happy
-            await client.chat_postMessage(
-                channel=event["channel"],
-                text=assistant.config.interfaces.slack.greeting,
-            )
+            with span("slack.chat_postMessage"):
+                await client.chat_postMessage(
+                    channel=event["channel"],
+                    text=assistant.config.interfaces.slack.greeting,
+                )
             await learn_channel_history_on_join(
                 assistant=assistant, client=client, channel_id=event["channel"]
             )
@@ -208,6 +222,7 @@ async def member_join(
 
 
 @app.event("channel_left")
+@traced_event("channel_left")
 async def channel_left(
     client: AsyncWebClient,
     event: Dict[str, Any],
@@ -233,12 +248,15 @@ async def channel_left(
         if is_assistant:
             # Erase chat history
             assistant = await load_assistant()
-            await assistant.memory.erase_chat_history(user=event["channel"])
+            with span("firedust.memory.erase_chat_history"):
+                await assistant.memory.erase_chat_history(user=event["channel"])
+            invalidate_channel(event["channel"])
     except Exception as e:
         raise SlackAppError(message=str(e))
 
 
 @app.event("channel_deleted")
+@traced_event("channel_deleted")
 async def channel_deleted(
     client: AsyncWebClient,
     event: Dict[str, Any],
@@ -263,12 +281,15 @@ async def channel_deleted(
         if is_assistant:
             # Erase chat history
             assistant = await load_assistant()
-            await assistant.memory.erase_chat_history(user=event["channel"])
+            with span("firedust.memory.erase_chat_history"):
+                await assistant.memory.erase_chat_history(user=event["channel"])
+            invalidate_channel(event["channel"])
     except Exception as e:
         raise SlackAppError(message=str(e))
 
 
 @app.event("group_left")
+@traced_event("group_left")
 async def group_left(
     client: AsyncWebClient, event: Dict[str, Any], ack: AsyncAck
 ) -> None:
@@ -286,12 +307,15 @@ async def group_left(
 
         if is_assistant:
             assistant = await load_assistant()
-            await assistant.memory.erase_chat_history(user=event["channel"])
+            with span("firedust.memory.erase_chat_history"):
+                await assistant.memory.erase_chat_history(user=event["channel"])
+            invalidate_channel(event["channel"])
     except Exception as e:
         raise SlackAppError(message=str(e))
 
 
 @app.event("group_deleted")
+@traced_event("group_deleted")
 async def group_deleted(
     client: AsyncWebClient, event: Dict[str, Any], ack: AsyncAck
 ) -> None:
@@ -309,6 +333,8 @@ async def group_deleted(
 
         if is_assistant:
             assistant = await load_assistant()
-            await assistant.memory.erase_chat_history(user=event["channel"])
+            with span("firedust.memory.erase_chat_history"):
+                await assistant.memory.erase_chat_history(user=event["channel"])
+            invalidate_channel(event["channel"])
     except Exception as e:
         raise SlackAppError(message=str(e))
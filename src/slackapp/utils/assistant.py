@@ -1,10 +1,19 @@
+import asyncio
 import os
+import time
 
 import firedust
 from firedust.types import AsyncAssistant, Message
 from slack_sdk.web.async_client import AsyncWebClient
 
-from slackapp.utils.slack import format_slack_message
+from slackapp.utils.replies import (
+    cache_reply,
+    get_cached_reply,
+    invalidate_channel,
+    reply_key,
+)
+from slackapp.utils.slack import format_slack_message, get_bot_user_id
+from slackapp.utils.tracing import span
 
 """
 Note:   Firedust keeps messages private between users by default. To facilitate group conversations,
@@ -13,22 +22,40 @@ Note:   Firedust keeps messages private between users by default. To facilitate
 """
 
 
+# The loaded assistant is reused until it expires, config changes apply after the TTL
+_ASSISTANT_TTL = float(os.environ.get("ASSISTANT_CACHE_TTL", "60"))
+_assistant: AsyncAssistant | None = None
+_assistant_expiration_time = 0.0
+_assistant_lock = asyncio.Lock()
+
+
 async def load_assistant() -> AsyncAssistant:
     """
-    Loads the AI assistant, using the ASSISTANT_NAME environment variable.
+    Loads the AI assistant, using the ASSISTANT_NAME environment variable. The assistant
+    is cached for ASSISTANT_CACHE_TTL seconds.
 
     Returns:
         AsyncAssistant: The AI assistant.
     """
-    assistant_name = os.environ.get("ASSISTANT_NAME")
-    if assistant_name is None:
-        raise RuntimeError("ASSISTANT_NAME environment variable is not set.")
+    global _assistant, _assistant_expiration_time
+
+    # Concurrent events wait for a single load instead of each loading the assistant
+    async with _assistant_lock:
+        if _assistant is not None and _assistant_expiration_time > time.monotonic():
+            return _assistant
 
-    assistant = await firedust.assistant.async_load(assistant_name)
-    if assistant.config.interfaces.slack is None:
-        raise RuntimeError("Slack interface is not configured.")
+        assistant_name = os.environ.get("ASSISTANT_NAME")
+        if assistant_name is None:
+            raise RuntimeError("ASSISTANT_NAME environment variable is not set.")
 
-    return assistant
+        with span("firedust.assistant.load"):
+            assistant = await firedust.assistant.async_load(assistant_name)
+        if assistant.config.interfaces.slack is None:
+            raise RuntimeError("Slack interface is not configured.")
+
+        _assistant = assistant
+        _assistant_expiration_time = time.monotonic() + _ASSISTANT_TTL
+        return assistant
 
 
 async def learn_message(
@@ -55,17 +82,20 @@ async def learn_message(
         user=user,
         channel_id=channel_id,
     )
-    await assistant.memory.add_chat_history(
-        messages=[
-            Message(
-                assistant=assistant.config.name,
-                user=channel_id,
-                timestamp=timestamp,
-                message=formatted_message,
-                author="user",
-            )
-        ],
-    )
+    with span("firedust.memory.add_chat_history") as memory_span:
+        memory_span.set_attribute("payload.size", len(formatted_message))
+        await assistant.memory.add_chat_history(
+            messages=[
+                Message(
+                    assistant=assistant.config.name,
+                    user=channel_id,
+                    timestamp=timestamp,
+                    message=formatted_message,
+                    author="user",
+                )
+            ],
+        )
+    invalidate_channel(channel_id)
 
 
 async def reply_to_message(
@@ -75,7 +105,10 @@ async def reply_to_message(
     channel_id: str,
 ) -> str:
     """
-    Generates a reply to a message from a user in a channel.
+    Generates a reply to a message from a user in a channel. If the reply cache is enabled
+    and the user repeats a question right after it was answered, with nothing new learned
+    in the channel since, the cached reply is reused and the exchange is only added to the
+    chat history.
 
     Args:
         client (AsyncWebClient): The Slack client.
@@ -87,12 +120,46 @@ async def reply_to_message(
         str: The response message.
     """
     assistant = await load_assistant()
+    config_fingerprint = assistant.config.model_dump_json()
     formatted_message = await format_slack_message(
         client=client,
         message=message,
         user=user,
         channel_id=channel_id,
     )
-    response = await assistant.chat.message(formatted_message, user=channel_id)
-    reply: str = response.message
+
+    # Take the key before generating, so learning during generation is not missed
+    key = reply_key(channel_id, user, message, await get_bot_user_id(client))
+    cached_reply = get_cached_reply(key, config_fingerprint)
+    if cached_reply is not None:
+        timestamp = time.time()
+        with span("firedust.memory.add_chat_history") as memory_span:
+            memory_span.set_attribute("reply_cache", "hit")
+            await assistant.memory.add_chat_history(
+                messages=[
+                    Message(
+                        assistant=assistant.config.name,
+                        user=channel_id,
+                        timestamp=timestamp,
+                        message=formatted_message,
+                        author="user",
+                    ),
+                    Message(
+                        assistant=assistant.config.name,
+                        user=channel_id,
+                        timestamp=timestamp,
+                        message=cached_reply,
+                        author="assistant",
+                    ),
+                ],
+            )
+        return cached_reply
+
+    with span("firedust.chat.message") as chat_span:
+        chat_span.set_attribute("payload.size", len(formatted_message))
+        response = await assistant.chat.message(formatted_message, user=channel_id)
+        reply: str = response.message
+        chat_span.set_attribute("reply.size", len(reply))
+
+    cache_reply(key, reply, config_fingerprint)
     return reply
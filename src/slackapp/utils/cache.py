@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A bounded in-memory cache where entries expire after a fixed time to live.
+    The least recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float, min_size: int = 0) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.min_size = min_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expiration_time = entry
+        if expiration_time <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def shrink(self, fraction: float = 0.5) -> int:
+        """
+        Drops expired entries, then the least recently used ones until at most
+        `fraction` of the current entries, but no fewer than `min_size`, remain.
+
+        Args:
+            fraction (float): The share of entries to keep.
+
+        Returns:
+            int: The number of dropped entries.
+        """
+        before = len(self._entries)
+        now = time.monotonic()
+        for key in [k for k, (_, exp) in self._entries.items() if exp <= now]:
+            del self._entries[key]
+
+        keep = max(int(before * fraction), self.min_size)
+        while len(self._entries) > keep:
+            self._entries.popitem(last=False)
+        return before - len(self._entries)
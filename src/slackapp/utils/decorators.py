@@ -2,6 +2,8 @@ import asyncio
 import logging
 from typing import Any, Callable, Coroutine, TypeVar
 
+from slackapp.utils.tracing import span
+
 log = logging.getLogger("slackapp")
 
 R = TypeVar("R")  # This will represent the return type of the decorated function
@@ -22,7 +24,8 @@ def retry(
         async def wrapper(*args: Any, **kwargs: Any) -> R:
             for r in range(max_retries):
                 try:
-                    return await func(*args, **kwargs)
+                    with span(f"retry.{func.__name__}", attempt=r + 1):
+                        return await func(*args, **kwargs)
                 except Exception as e:
                     if r == max_retries - 1:
                         raise e
@@ -0,0 +1,134 @@
+import json
+import math
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+"""
+Note:   Messages are stored in the assistant's memory in a compact canonical form. A single
+        message states its channel and author on one line each. A batch states the channel
+        once and puts every author in front of their message, with authors and mentions
+        resolved to names before encoding.
+"""
+
+# Messages per memory entry when channel history is imported in batches
+MESSAGES_PER_ENTRY = 20
+
+_MENTION = re.compile(r"<@([UW][A-Za-z0-9]+)>")
+
+
+def mentioned_user_ids(message: str) -> List[str]:
+    return _MENTION.findall(message)
+
+
+def replace_mentions(message: str, user_names: Dict[str, str]) -> str:
+    """
+    Replace user mentions with already resolved user names. Unknown IDs are kept.
+
+    Args:
+        message (str): The message to format.
+        user_names (Dict[str, str]): User names by user ID.
+
+    Returns:
+        str: The formatted message.
+    """
+    return _MENTION.sub(
+        lambda m: f"@{user_names[m.group(1)]}" if m.group(1) in user_names else m[0],
+        message,
+    )
+
+
+def encode_message(channel_name: str, user_name: str, message: str) -> str:
+    return f"Slack channel: {channel_name}\nFrom {user_name}:\n{message.strip()}"
+
+
+def encode_message_batch(channel_name: str, messages: List[Tuple[str, str]]) -> str:
+    """
+    Encode messages from one channel as a single entry.
+
+    Args:
+        channel_name (str): The name of the channel.
+        messages (List[Tuple[str, str]]): Author names and messages, oldest first.
+
+    Returns:
+        str: The encoded batch.
+    """
+    lines = [f"Slack channel: {channel_name}"]
+    lines.extend(f"{user_name}: {message.strip()}" for user_name, message in messages)
+    return "\n\n".join(lines)
+
+
+def legacy_encode_message(channel_name: str, user_name: str, message: str) -> str:
+    # The template previously used for every message, kept to measure the savings
+    return f"""
+    Slack channel: {channel_name}
+    From {user_name}:
+
+    {message}
+    """
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text
+    return math.ceil(len(text) / 4)
+
+
+def load_export(path: Path) -> List[Dict[str, Any]]:
+    """
+    Load messages from a Slack export: either one day file or a channel directory
+    of day files.
+
+    Args:
+        path (Path): The file or directory.
+
+    Returns:
+        List[Dict[str, Any]]: The messages with a user and text, oldest first.
+    """
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    messages: List[Dict[str, Any]] = []
+    for file in files:
+        messages.extend(json.loads(file.read_text(encoding="utf-8")))
+    messages = [m for m in messages if m.get("user") and m.get("text")]
+    return sorted(messages, key=lambda m: float(m.get("ts", 0)))
+
+
+def measure_encodings(
+    messages: List[Dict[str, Any]],
+    channel_name: str,
+    user_names: Dict[str, str],
+    batch_size: int,
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Compare the payload of the legacy and the compact encodings.
+
+    Args:
+        messages (List[Dict[str, Any]]): Slack messages with a user and text.
+        channel_name (str): The name of the channel.
+        user_names (Dict[str, str]): User names by user ID.
+        batch_size (int): Messages per batch for the batched encoding.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Bytes and estimated tokens by encoding.
+    """
+    resolved = [
+        (
+            user_names.get(m["user"], m["user"]),
+            replace_mentions(m["text"], user_names),
+        )
+        for m in messages
+    ]
+    encoded = {
+        "legacy": [legacy_encode_message(channel_name, u, t) for u, t in resolved],
+        "compact": [encode_message(channel_name, u, t) for u, t in resolved],
+        "compact batched": [
+            encode_message_batch(channel_name, resolved[i : i + batch_size])
+            for i in range(0, len(resolved), batch_size)
+        ],
+    }
+    return {
+        name: (
+            sum(len(e.encode("utf-8")) for e in entries),
+            sum(estimate_tokens(e) for e in entries),
+        )
+        for name, entries in encoded.items()
+    }
@@ -1,11 +1,25 @@
 import asyncio
 import logging
+import os
+from typing import Dict, List
 from uuid import uuid4
 
 from slack_sdk.web.async_client import AsyncWebClient
 
+from slackapp.utils import memory
+from slackapp.utils.tasks import supervisor
+from slackapp.utils.tracing import span
+
 log = logging.getLogger("slackapp")
 
+# Errors after the first one in a channel are merged into one message per window
+_NOTIFY_WINDOW = float(os.environ.get("ERROR_NOTIFY_WINDOW", "10"))
+_pending_error_codes: Dict[str, List[str]] = {}
+memory.register(
+    "pending_error_codes",
+    lambda: sum(len(codes) for codes in _pending_error_codes.values()),
+)
+
 
 class SlackAppError(Exception):
     """
@@ -25,22 +39,63 @@ class SlackAppError(Exception):
         self.message = message
         self._log_error_and_notify()  # Call the notify method
 
-    async def _notify(self) -> None:
-        # Notify the user if client and channel_id are provided
-        if self.client and self.channel_id:
-            error_message = f"""
-            Apologies, I encountered an unexpected error. Our team received a note about this and is looking into it. For more details, please contact us at firedvst@gmail.com and mention error code `{self.error_code}`.
-            """
-            await self.client.chat_postMessage(
-                channel=self.channel_id, text=error_message
-            )
-
     def _log_error_and_notify(self) -> None:
         # Log the error
         log.error(f"Error code {self.error_code}: {self}")
 
         # TODO: Add a db entry and a ticket for the error
 
-        # Since we cannot await in the __init__, ensure that notification happens asynchronously.
+        # Notify the user if client and channel_id are provided
         if self.client and self.channel_id:
-            asyncio.create_task(self._notify())
+            _queue_notification(self.client, self.channel_id, self.error_code)
+
+
+def _queue_notification(
+    client: AsyncWebClient, channel_id: str, error_code: str
+) -> None:
+    """
+    Notifies the channel about an error right away, then merges further errors in the
+    same channel into a single message sent when the window closes.
+
+    Args:
+        client (AsyncWebClient): The Slack client.
+        channel_id (str): The ID of the channel to notify.
+        error_code (str): The error code to report.
+    """
+    if channel_id in _pending_error_codes:
+        _pending_error_codes[channel_id].append(error_code)
+        return
+
+    _pending_error_codes[channel_id] = []
+    supervisor.spawn(
+        _post_error_message(client, channel_id, [error_code]),
+        name=f"notify_error_{channel_id}",
+    )
+    # Close the window with a timer, so no task holds a supervisor slot while waiting
+    asyncio.get_running_loop().call_later(
+        _NOTIFY_WINDOW, _flush_notifications, client, channel_id
+    )
+
+
+def _flush_notifications(client: AsyncWebClient, channel_id: str) -> None:
+    error_codes = _pending_error_codes.pop(channel_id, [])
+    if error_codes:
+        supervisor.spawn(
+            _post_error_message(client, channel_id, error_codes),
+            name=f"notify_errors_{channel_id}",
+        )
+
+
+async def _post_error_message(
+    client: AsyncWebClient, channel_id: str, error_codes: List[str]
+) -> None:
+    codes = ", ".join(f"`{code}`" for code in error_codes)
+    if len(error_codes) == 1:
+        summary = f"Apologies, I encountered an unexpected error (code {codes})."
+    else:
+        summary = f"Apologies, {len(error_codes)} requests failed (codes {codes})."
+    error_message = f"""
+    {summary} Our team received a note about this and is looking into it. For more details, please contact us at firedvst@gmail.com and mention the error code.
+    """
+    with span("slack.chat_postMessage"):
+        await client.chat_postMessage(channel=channel_id, text=error_message)
@@ -0,0 +1,172 @@
+import asyncio
+import gc
+import logging
+import os
+import signal
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+log = logging.getLogger("slackapp")
+
+"""
+Note:   Long-lived caches and buffers register here with a size callback and, if they can
+        drop data, a shrink callback. When the process RSS exceeds MEMORY_BUDGET_MB, every
+        shrinkable structure is asked to shrink. Freed memory is rarely returned to the OS,
+        so structures are only shrunk again once RSS has grown further since the last
+        shrink. Sending SIGUSR1 to the process logs a tracemalloc snapshot and the size
+        of each registered structure.
+"""
+
+
+@dataclass
+class _Registered:
+    size: Callable[[], int]
+    shrink: Callable[[], int] | None
+
+
+_registry: Dict[str, _Registered] = {}
+
+# RSS right after the last shrink, and how much it must grow before shrinking again
+_rss_after_shrink: int | None = None
+_REGROWTH_FRACTION = 0.1
+
+
+def register(
+    name: str, size: Callable[[], int], shrink: Callable[[], int] | None = None
+) -> None:
+    """
+    Registers a structure against the process-wide memory budget.
+
+    Args:
+        name (str): A unique name, reported in diagnostics.
+        size (Callable[[], int]): Returns the number of entries held.
+        shrink (Callable[[], int] | None): Drops entries under pressure and returns how many.
+    """
+    _registry[name] = _Registered(size=size, shrink=shrink)
+
+
+def structure_sizes() -> Dict[str, int]:
+    return {name: entry.size() for name, entry in _registry.items()}
+
+
+def current_rss() -> int | None:
+    """
+    Returns the resident set size of the process in bytes, or None on platforms
+    without /proc, where the budget is not enforced.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def memory_budget() -> int | None:
+    """
+    Returns the memory budget in bytes from MEMORY_BUDGET_MB, or None if unset.
+    """
+    budget = os.environ.get("MEMORY_BUDGET_MB")
+    if not budget:
+        return None
+    return int(float(budget) * 1024 * 1024)
+
+
+def under_pressure() -> bool:
+    budget = memory_budget()
+    rss = current_rss()
+    return budget is not None and rss is not None and rss > budget
+
+
+def enforce_budget() -> int:
+    """
+    Shrinks every registered structure if the process is over its memory budget and
+    RSS has grown since the last shrink.
+
+    Returns:
+        int: The number of dropped entries.
+    """
+    global _rss_after_shrink
+
+    budget = memory_budget()
+    rss = current_rss()
+    if budget is None or rss is None or rss <= budget:
+        _rss_after_shrink = None
+        return 0
+    if (
+        _rss_after_shrink is not None
+        and rss <= _rss_after_shrink + budget * _REGROWTH_FRACTION
+    ):
+        return 0
+
+    dropped = 0
+    for name, entry in _registry.items():
+        if entry.shrink is None:
+            continue
+        try:
+            dropped += entry.shrink()
+        except Exception as e:
+            log.error(f"Failed to shrink {name}: {e}")
+    gc.collect()
+    _rss_after_shrink = current_rss() or rss
+    log.warning(
+        f"Memory budget exceeded, dropped {dropped} entries. RSS is now {_rss_after_shrink // 2**20} MB"
+    )
+    return dropped
+
+
+async def watch_memory_budget(interval: float = 30.0) -> None:
+    """
+    Enforces the memory budget periodically. Does nothing if MEMORY_BUDGET_MB is unset.
+
+    Args:
+        interval (float): Seconds between checks.
+    """
+    budget = memory_budget()
+    if budget is None:
+        return
+    if current_rss() is None:
+        log.warning("Cannot read the process RSS, the memory budget is not enforced")
+        return
+
+    log.info(f"Enforcing a memory budget of {budget // 2**20} MB")
+    while True:
+        enforce_budget()
+        await asyncio.sleep(interval)
+
+
+def dump_diagnostics(top_n: int = 20) -> None:
+    """
+    Logs the RSS, the size of each registered structure and, if tracemalloc is running,
+    the top allocation sites.
+
+    Args:
+        top_n (int): The number of allocation sites to report.
+    """
+    rss = current_rss()
+    lines = [f"RSS: {rss // 2**20} MB" if rss is not None else "RSS: unknown"]
+    for name, size in structure_sizes().items():
+        lines.append(f"{name}: {size} entries")
+
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        for stat in snapshot.statistics("lineno")[:top_n]:
+            lines.append(str(stat))
+    else:
+        lines.append("tracemalloc is off, set MEMORY_TRACEMALLOC to enable it")
+
+    log.info("Memory diagnostics:\n" + "\n".join(lines))
+
+
+def install_diagnostics() -> None:
+    """
+    Starts tracemalloc if MEMORY_TRACEMALLOC is set to a frame count, and dumps
+    diagnostics on SIGUSR1. Must be called from within the running event loop.
+    """
+    frames = os.environ.get("MEMORY_TRACEMALLOC")
+    if frames:
+        tracemalloc.start(int(frames))
+
+    if hasattr(signal, "SIGUSR1"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, dump_diagnostics)
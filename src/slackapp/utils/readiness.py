@@ -0,0 +1,33 @@
+import logging
+import os
+
+log = logging.getLogger("slackapp")
+
+"""
+Note:   Readiness is signalled through the file at READY_FILE. It is removed when the app
+        starts and when it exits, so a file left over from a previous run is never taken
+        as a sign that this run finished warming up.
+"""
+
+
+def signal_ready() -> None:
+    """
+    Signals that the app accepts events, by writing the file at READY_FILE if set.
+    """
+    ready_file = os.environ.get("READY_FILE")
+    if ready_file:
+        with open(ready_file, "w") as f:
+            f.write(str(os.getpid()))
+    log.info("Slack app is ready")
+
+
+def clear_ready() -> None:
+    """
+    Removes the file at READY_FILE if set.
+    """
+    ready_file = os.environ.get("READY_FILE")
+    if ready_file:
+        try:
+            os.unlink(ready_file)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,151 @@
+import logging
+import os
+import re
+from typing import Dict, Tuple
+
+from slackapp.utils import memory
+from slackapp.utils.cache import TTLCache
+
+log = logging.getLogger("slackapp")
+
+"""
+Note:   The reply cache is disabled unless REPLY_CACHE_SIZE is set. Entries are keyed by channel,
+        a per-channel generation, the asker and the normalized question. Anything that changes
+        the channel's memory bumps its generation: learned messages, history imports, erased
+        history and every generated exchange. A reply is cached under the generation that
+        follows its own exchange, so it only serves the same asker repeating the question
+        right away. Older replies are never served again and age out of the cache. A change
+        of the assistant config clears the whole cache.
+"""
+
+_REPORT_EVERY = 100
+
+# Channel ID, channel generation, asker user ID and normalized question
+ReplyKey = Tuple[str, int, str, str]
+
+_cache_size = int(os.environ.get("REPLY_CACHE_SIZE", "0"))
+_reply_cache: TTLCache[ReplyKey, str] | None = (
+    TTLCache(
+        "replies",
+        max_size=_cache_size,
+        ttl=float(os.environ.get("REPLY_CACHE_TTL", "3600")),
+    )
+    if _cache_size > 0
+    else None
+)
+_channel_generations: Dict[str, int] = {}
+_config_fingerprint: str | None = None
+
+if _reply_cache is not None:
+    memory.register("reply_cache", _reply_cache.__len__, _reply_cache.shrink)
+
+
+def normalize_question(message: str, bot_user_id: str) -> str:
+    """
+    Normalize a question so trivially different phrasings share a cache entry:
+    mentions of the bot are removed, case and whitespace are folded outside other
+    mentions, trailing punctuation is dropped. Other mentions keep their user IDs.
+
+    Args:
+        message (str): The raw Slack message.
+        bot_user_id (str): The user ID of the bot.
+
+    Returns:
+        str: The normalized question.
+    """
+    message = message.replace(f"<@{bot_user_id}>", " ")
+    parts = re.split(r"(<@[UW][A-Za-z0-9]+>)", message)
+    message = "".join(part if i % 2 else part.lower() for i, part in enumerate(parts))
+    return " ".join(message.split()).rstrip("?!. ")
+
+
+def reply_key(channel_id: str, user: str, message: str, bot_user_id: str) -> ReplyKey:
+    """
+    Build the cache key of a question. The key captures the channel's generation, so
+    take it before generating a reply: a reply to a key that is no longer current is
+    not cached. Replies can address the asker by name, so the asker is part of the key.
+
+    Args:
+        channel_id (str): The channel ID.
+        user (str): The user ID of the asker.
+        message (str): The question.
+        bot_user_id (str): The user ID of the bot.
+
+    Returns:
+        ReplyKey: The cache key.
+    """
+    return (
+        channel_id,
+        _channel_generations.get(channel_id, 0),
+        user,
+        normalize_question(message, bot_user_id),
+    )
+
+
+def _check_config(config_fingerprint: str) -> None:
+    global _config_fingerprint
+    if _reply_cache is not None and config_fingerprint != _config_fingerprint:
+        _reply_cache.clear()
+        _config_fingerprint = config_fingerprint
+
+
+def get_cached_reply(key: ReplyKey, config_fingerprint: str) -> str | None:
+    """
+    Look up a cached reply to a question asked in a channel.
+
+    Args:
+        key (ReplyKey): The key of the question.
+        config_fingerprint (str): Identifies the current assistant config.
+
+    Returns:
+        str | None: The cached reply, or None on a miss or if the cache is disabled.
+    """
+    # A bare mention has no question, it never shares a reply with another one
+    if _reply_cache is None or not key[3]:
+        return None
+
+    _check_config(config_fingerprint)
+    reply = _reply_cache.get(key)
+
+    lookups = _reply_cache.hits + _reply_cache.misses
+    if lookups % _REPORT_EVERY == 0:
+        log.info(
+            f"Reply cache hit rate {_reply_cache.hits / lookups:.1%} over {lookups} lookups"
+        )
+    return reply
+
+
+def cache_reply(key: ReplyKey, reply: str, config_fingerprint: str) -> None:
+    """
+    Record a generated exchange: the channel's memory now holds it, so its generation
+    is bumped, and the reply is cached under the new generation. The reply is dropped
+    if the question is empty, or if the channel learned something or the config changed
+    while it was generated.
+
+    Args:
+        key (ReplyKey): The key taken before the reply was generated.
+        reply (str): The generated reply.
+        config_fingerprint (str): Identifies the assistant config the reply was made with.
+    """
+    if _reply_cache is None:
+        return
+
+    channel_id, generation, user, question = key
+    unchanged = _channel_generations.get(channel_id, 0) == generation
+    invalidate_channel(channel_id)
+    if not question or not unchanged or config_fingerprint != _config_fingerprint:
+        return
+    _reply_cache.set((channel_id, generation + 1, user, question), reply)
+
+
+def invalidate_channel(channel_id: str) -> None:
+    """
+    Stop serving cached replies for a channel, e.g. after it learned new messages.
+
+    Args:
+        channel_id (str): The channel ID.
+    """
+    if _reply_cache is None:
+        return
+
+    _channel_generations[channel_id] = _channel_generations.get(channel_id, 0) + 1
@@ -1,17 +1,45 @@
 import asyncio
-import re
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterable, List
 
 from firedust.types import AsyncAssistant, Message
 from slack_sdk.web.async_client import AsyncWebClient
 
+from slackapp.utils import memory
+from slackapp.utils.cache import TTLCache
 from slackapp.utils.decorators import retry
-
-# A quick cache implementation to store frequently requested values
-_expiration_time = float
-_value = str
-_user_name_cache: Dict[str, Tuple[_value, _expiration_time]] = {}
-_channel_name_cache: Dict[str, Tuple[_value, _expiration_time]] = {}
+from slackapp.utils.encoding import (
+    MESSAGES_PER_ENTRY,
+    encode_message,
+    encode_message_batch,
+    mentioned_user_ids,
+    replace_mentions,
+)
+from slackapp.utils.replies import invalidate_channel
+from slackapp.utils.tracing import current_span, span
+
+# Caches for frequently requested values, entries expire after 10 minutes
+# Under memory pressure they keep a working set, so lookups do not all go to Slack
+_user_name_cache: TTLCache[str, str] = TTLCache(
+    "user_names", max_size=10000, ttl=600, min_size=1000
+)
+_channel_name_cache: TTLCache[str, str] = TTLCache(
+    "channel_names", max_size=10000, ttl=600, min_size=1000
+)
+memory.register("user_name_cache", _user_name_cache.__len__, _user_name_cache.shrink)
+memory.register(
+    "channel_name_cache", _channel_name_cache.__len__, _channel_name_cache.shrink
+)
+
+# The bot user ID never changes while the app runs
+_bot_user_id: str | None = None
+
+# Channel history is stored in entries of up to MESSAGES_PER_ENTRY messages. Entries of
+# imports in progress are buffered and flushed to memory _HISTORY_BATCH_SIZE at a time.
+_HISTORY_BATCH_SIZE = 25
+_history_buffers: Dict[str, List[Message]] = {}
+memory.register(
+    "history_buffers", lambda: sum(len(b) for b in _history_buffers.values())
+)
 
 
 @retry()
@@ -27,23 +55,24 @@ async def get_user_name(client: AsyncWebClient, user: str) -> str:
         str: The name of the user.
     """
     # Check if the user name is already cached and not expired
-    if user in _user_name_cache:
-        cached_value, expiration_time = _user_name_cache[user]
-        if expiration_time > asyncio.get_event_loop().time():
-            return cached_value
-
-    response = await client.users_info(user=user)
+    attempt = current_span()
+    cached_value = _user_name_cache.get(user)
+    if cached_value is not None:
+        if attempt is not None:
+            attempt.set_attribute("cache", "hit")
+        return cached_value
+    if attempt is not None:
+        attempt.set_attribute("cache", "miss")
+
+    with span("slack.users_info"):
+        response = await client.users_info(user=user)
     assert isinstance(response.data, dict)
 
     user_name: str = response.data["user"].get("real_name") or response.data["user"][
         "profile"
     ].get("real_name")
 
-    # Set expiration time to 10 minutes from now
-    expiration_time = asyncio.get_event_loop().time() + 600
-
-    # Cache the user name with expiration time
-    _user_name_cache[user] = (user_name, expiration_time)
+    _user_name_cache.set(user, user_name)
 
     return user_name
 
@@ -61,28 +90,61 @@ async def get_channel_name(client: AsyncWebClient, channel_id: str) -> str:
         str: The name of the channel.
     """
     # Check if the channel name is already cached and not expired
-    if channel_id in _channel_name_cache:
-        cached_value, expiration_time = _channel_name_cache[channel_id]
-        if expiration_time > asyncio.get_event_loop().time():
-            return cached_value
-
-    response = await client.conversations_info(channel=channel_id)
+    attempt = current_span()
+    cached_value = _channel_name_cache.get(channel_id)
+    if cached_value is not None:
+        if attempt is not None:
+            attempt.set_attribute("cache", "hit")
+        return cached_value
+    if attempt is not None:
+        attempt.set_attribute("cache", "miss")
+
+    with span("slack.conversations_info"):
+        response = await client.conversations_info(channel=channel_id)
     assert isinstance(response.data, dict)
 
-    if response.data["channel"].get("is_im", False):
-        channel_name = "Direct Message"
-    else:
-        channel_name = (
-            response.data["channel"].get("name") or response.data["channel"]["id"]
-        )
+    channel_name = _channel_display_name(response.data["channel"])
+    _channel_name_cache.set(channel_id, channel_name)
 
-    # Set expiration time to 10 minutes from now
-    expiration_time = asyncio.get_event_loop().time() + 600
+    return channel_name
 
-    # Cache the channel name with expiration time
-    _channel_name_cache[channel_id] = (channel_name, expiration_time)
 
-    return channel_name
+def _channel_display_name(channel: Dict[str, Any]) -> str:
+    if channel.get("is_im", False):
+        return "Direct Message"
+    name: str = channel.get("name") or channel["id"]
+    return name
+
+
+@retry()
+async def prefetch_channel_names(client: AsyncWebClient) -> int:
+    """
+    Cache the names of all channels the bot is a member of.
+
+    Args:
+        client (AsyncWebClient): The Slack client.
+
+    Returns:
+        int: The number of cached channel names.
+    """
+    cursor = None
+    count = 0
+    while True:
+        with span("slack.users_conversations"):
+            response = await client.users_conversations(
+                types="public_channel,private_channel,mpim,im",
+                cursor=cursor,
+                limit=200,
+            )
+        assert isinstance(response.data, dict)
+
+        for channel in response.data.get("channels", []):
+            _channel_name_cache.set(channel["id"], _channel_display_name(channel))
+            count += 1
+
+        cursor = response.data.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            return count
 
 
 @retry()
@@ -96,9 +158,15 @@ async def get_bot_user_id(client: AsyncWebClient) -> str:
     Returns:
         str: The user ID of the bot user.
     """
-    response = await client.auth_test()
+    global _bot_user_id
+    if _bot_user_id is not None:
+        return _bot_user_id
+
+    with span("slack.auth_test"):
+        response = await client.auth_test()
     assert isinstance(response.data, dict)
     user: str = response.data["user_id"]
+    _bot_user_id = user
     return user
 
 
@@ -113,53 +181,100 @@ async def learn_channel_history_on_join(
         client (AsyncWebClient): The Slack client.
         event (Dict[str, Any]): The event data.
     """
-    await client.chat_postMessage(
-        channel=channel_id,
-        text="I'm learning the channel history. Give me a few moments to add past conversations to my memory.",
-    )
+    with span("slack.chat_postMessage"):
+        await client.chat_postMessage(
+            channel=channel_id,
+            text="I'm learning the channel history. Give me a few moments to add past conversations to my memory.",
+        )
 
     # Learn the channel history
-    # Initialize the cursor for pagination and collect all messages
+    # Initialize the cursor for pagination and buffer messages until a batch is full
     cursor = None
-    all_messages = []
-
-    while True:
-        # Fetch a page of message history
-        response = await client.conversations_history(channel=channel_id, cursor=cursor)
-        messages: List[Dict[str, str]] = response.get("messages", [])
-
-        # Format and collect messages
-        for message in messages:
-            formatted_message = await format_slack_message(
-                client=client,
-                message=message["text"],
-                user=message["user"],
-                channel_id=channel_id,
-            )
-            all_messages.append(
-                Message(
-                    assistant=assistant.config.name,
-                    user=message["user"],
-                    message=formatted_message,
-                    author="user",
+    channel_name = await get_channel_name(client, channel_id)
+    buffer = _history_buffers.setdefault(channel_id, [])
+
+    try:
+        while True:
+            # Fetch a page of message history
+            with span("slack.conversations_history") as page_span:
+                response = await client.conversations_history(
+                    channel=channel_id, cursor=cursor
                 )
-            )
+                messages: List[Dict[str, str]] = response.get("messages", [])
+                page_span.set_attribute("payload.messages", len(messages))
+
+            # Resolve the page's authors and mentions once, then encode it in
+            # entries that state the channel only once, oldest messages first
+            messages = [
+                m for m in reversed(messages) if m.get("user") and m.get("text")
+            ]
+            user_ids = {m["user"] for m in messages}
+            for m in messages:
+                user_ids.update(mentioned_user_ids(m["text"]))
+            user_names = await resolve_user_names(client, user_ids)
+
+            for i in range(0, len(messages), MESSAGES_PER_ENTRY):
+                entry = messages[i : i + MESSAGES_PER_ENTRY]
+                buffer.append(
+                    Message(
+                        assistant=assistant.config.name,
+                        user=channel_id,
+                        timestamp=float(entry[-1]["ts"]),
+                        message=encode_message_batch(
+                            channel_name,
+                            [
+                                (
+                                    user_names[m["user"]],
+                                    replace_mentions(m["text"], user_names),
+                                )
+                                for m in entry
+                            ],
+                        ),
+                        author="user",
+                    )
+                )
+
+            # Save full batches early, and everything buffered under memory pressure
+            if len(buffer) >= _HISTORY_BATCH_SIZE or memory.under_pressure():
+                await _save_history(assistant, buffer)
 
-        # Check if there are more pages to fetch
-        if not response["has_more"]:
-            break
+            # Check if there are more pages to fetch
+            if not response["has_more"]:
+                break
 
-        # Get the cursor for the next page
-        cursor = response["response_metadata"]["next_cursor"]
+            # Get the cursor for the next page
+            cursor = response["response_metadata"]["next_cursor"]
 
-    # Save messages to the assistant's memory
-    await assistant.memory.add_chat_history(messages=all_messages)
+        # Save the remaining messages to the assistant's memory
+        await _save_history(assistant, buffer)
+    finally:
+        _history_buffers.pop(channel_id, None)
+        invalidate_channel(channel_id)
 
     # Notify channel that the assistant has learned channel history
-    await client.chat_postMessage(
-        channel=channel_id,
-        text="Done! I'm ready to assist you.",
-    )
+    with span("slack.chat_postMessage"):
+        await client.chat_postMessage(
+            channel=channel_id,
+            text="Done! I'm ready to assist you.",
+        )
+
+
+async def _save_history(assistant: AsyncAssistant, buffer: List[Message]) -> None:
+    """
+    Add buffered history messages to the assistant's memory and empty the buffer.
+
+    Args:
+        assistant (AsyncAssistant): The assistant.
+        buffer (List[Message]): The buffered messages.
+    """
+    if not buffer:
+        return
+
+    with span("firedust.memory.add_chat_history") as memory_span:
+        memory_span.set_attribute("payload.messages", len(buffer))
+        memory_span.set_attribute("payload.size", sum(len(m.message) for m in buffer))
+        await assistant.memory.add_chat_history(messages=buffer)
+    buffer.clear()
 
 
 async def format_slack_message(
@@ -186,13 +301,31 @@ async def format_slack_message(
     channel_name = await get_channel_name(client, channel_id)
     user_name = await get_user_name(client, user)
     message = await replace_mentions_with_user_names(client, message)
-    formatted_message = f"""
-    Slack channel: {channel_name}
-    From {user_name}:
+    return encode_message(channel_name, user_name, message)
+
+
+async def resolve_user_names(
+    client: AsyncWebClient, user_ids: Iterable[str]
+) -> Dict[str, str]:
+    """
+    Resolve the names of several users, a few requests at a time.
 
-    {message}
+    Args:
+        client (AsyncWebClient): The Slack client.
+        user_ids (Iterable[str]): The user IDs.
+
+    Returns:
+        Dict[str, str]: User names by user ID.
     """
-    return formatted_message
+    semaphore = asyncio.Semaphore(8)
+
+    async def resolve(user: str) -> str:
+        async with semaphore:
+            return await get_user_name(client, user)
+
+    ids = list(user_ids)
+    names = await asyncio.gather(*(resolve(user) for user in ids))
+    return dict(zip(ids, names))
 
 
 @retry()
@@ -207,7 +340,11 @@ async def replace_mentions_with_user_names(client: AsyncWebClient, message: str)
     Returns:
         str: The formatted message.
     """
-    user_ids = re.findall(r"<@([UW][A-Za-z0-9]+)>", message)
+    user_ids = mentioned_user_ids(message)
+    attempt = current_span()
+    if attempt is not None:
+        attempt.set_attribute("payload.size", len(message))
+        attempt.set_attribute("mentions", len(user_ids))
     for _id in user_ids:
         name = await get_user_name(client, _id)
         message = message.replace(f"<@{_id}>", f"@{name}")
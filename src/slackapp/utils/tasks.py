@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+from typing import Any, Coroutine, Set
+
+from slackapp.utils import memory
+
+log = logging.getLogger("slackapp")
+
+
+class TaskSupervisor:
+    """
+    Runs fire-and-forget coroutines as tasks. Holds a reference to every task until it
+    finishes, caps how many run at once, drops new work when too many are waiting and
+    logs any exception a task raises. Long-running service tasks are spawned unbounded,
+    so they never take a slot from short-lived work.
+    """
+
+    def __init__(self, max_concurrency: int, max_pending: int) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def spawn(
+        self, coro: Coroutine[Any, Any, None], name: str, bounded: bool = True
+    ) -> "asyncio.Task[None] | None":
+        """
+        Schedules a coroutine under supervision.
+
+        Args:
+            coro (Coroutine[Any, Any, None]): The work to run.
+            name (str): A task name used in logs.
+            bounded (bool): Whether the task counts against the concurrency and
+                pending limits. Pass False for tasks that run for the app's lifetime.
+
+        Returns:
+            asyncio.Task[None] | None: The task, or None if the work was dropped.
+        """
+        if not bounded:
+            task = asyncio.create_task(coro, name=name)
+            self._tasks.add(task)
+            task.add_done_callback(self._on_done)
+            return task
+
+        if len(self._tasks) >= self.max_pending:
+            log.warning(f"Dropping task {name}: {len(self._tasks)} tasks pending")
+            coro.close()
+            return None
+
+        task = asyncio.create_task(self._run(coro), name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    async def _run(self, coro: Coroutine[Any, Any, None]) -> None:
+        async with self._semaphore:
+            await coro
+
+    def _on_done(self, task: "asyncio.Task[None]") -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        exception = task.exception()
+        if exception is not None:
+            log.error(f"Task {task.get_name()} failed with error: {exception!r}")
+
+    async def shutdown(self) -> None:
+        """
+        Cancels all supervised tasks and waits for them to finish.
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+supervisor = TaskSupervisor(
+    max_concurrency=int(os.environ.get("TASK_MAX_CONCURRENCY", "64")),
+    max_pending=int(os.environ.get("TASK_MAX_PENDING", "1024")),
+)
+memory.register("supervised_tasks", supervisor.__len__)
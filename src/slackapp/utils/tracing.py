@@ -0,0 +1,263 @@
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Dict, Iterator, Protocol, TypeVar
+from uuid import uuid4
+
+log = logging.getLogger("slackapp")
+
+R = TypeVar("R")
+
+"""
+Note:   Tracing is disabled unless TRACE_EXPORT_PATH is set. Each Bolt event opens a root span,
+        outbound Slack and firedust calls open child spans. The sampling decision is made once
+        per root span and inherited by its children, so a trace is exported whole or not at all.
+"""
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    parent_id: str | None
+    sampled: bool
+    span_id: str = field(default_factory=lambda: uuid4().hex[:16])
+    start_time: float = field(default_factory=time.time)
+    end_time: float | None = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    _start_counter: float = field(default_factory=time.perf_counter, repr=False)
+    duration_ms: float | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def end(self) -> None:
+        self.end_time = time.time()
+        self.duration_ms = (time.perf_counter() - self._start_counter) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        ...
+
+
+class JsonlFileExporter:
+    """
+    Appends every finished span as one JSON line to a local file. Spans are queued and
+    written by a background thread, so exporting never blocks the event loop on disk.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._queue: "queue.SimpleQueue[Span | None]" = queue.SimpleQueue()
+        self._file = open(path, "a", encoding="utf-8")
+        self._writer = threading.Thread(
+            target=self._write, name="span-exporter", daemon=True
+        )
+        self._writer.start()
+
+    def export(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def _write(self) -> None:
+        # Write spans as they arrive, flushing only once the queue is drained
+        while True:
+            span = self._queue.get()
+            if span is None:
+                break
+            self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+            if self._queue.empty():
+                self._file.flush()
+        self._file.close()
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+
+
+_exporter: SpanExporter | None = None
+_sample_rate: float = 1.0
+_current_span: ContextVar[Span | None] = ContextVar("slackapp_span", default=None)
+_NOOP_SPAN = Span(name="noop", trace_id="", parent_id=None, sampled=False)
+_channel_type: ContextVar[str | None] = ContextVar(
+    "slackapp_channel_type", default=None
+)
+
+# Slack channel IDs start with a letter that tells the channel type
+_CHANNEL_TYPES = {"C": "channel", "G": "group", "D": "im"}
+
+
+def configure_tracing(
+    exporter: SpanExporter | None = None, sample_rate: float | None = None
+) -> None:
+    """
+    Configures tracing. Without arguments, reads TRACE_EXPORT_PATH and TRACE_SAMPLE_RATE
+    from the environment; tracing stays disabled if no exporter is available.
+
+    Args:
+        exporter (SpanExporter | None): The exporter that receives finished spans.
+        sample_rate (float | None): Fraction of root spans to export, between 0 and 1.
+    """
+    global _exporter, _sample_rate
+
+    if exporter is None:
+        path = os.environ.get("TRACE_EXPORT_PATH")
+        if path:
+            exporter = JsonlFileExporter(path)
+
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError("TRACE_SAMPLE_RATE must be between 0 and 1.")
+
+    _exporter = exporter
+    _sample_rate = sample_rate
+    if exporter is not None:
+        log.info(f"Tracing enabled with sample rate {sample_rate}")
+
+
+def shutdown_tracing() -> None:
+    """
+    Flushes and closes the exporter, if any.
+    """
+    global _exporter
+    if _exporter is not None:
+        _exporter.shutdown()
+        _exporter = None
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def channel_type(event: Dict[str, Any]) -> str | None:
+    """
+    Returns the channel type of an event, derived from the channel ID when the event
+    does not carry it, as for app_mention events.
+
+    Args:
+        event (Dict[str, Any]): Event data from Slack.
+
+    Returns:
+        str | None: The channel type, or None if the event has no channel.
+    """
+    if event.get("channel_type"):
+        return str(event["channel_type"])
+    channel = event.get("channel")
+    if isinstance(channel, str) and channel:
+        return _CHANNEL_TYPES.get(channel[0])
+    return None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Opens a span as a child of the current span, or a new trace if there is none.
+
+    Args:
+        name (str): The span name, e.g. "slack.users_info".
+        attributes (Any): Initial span attributes.
+
+    Yields:
+        Span: The open span, to attach further attributes.
+    """
+    parent = _current_span.get()
+
+    # Unsampled traces share one span that records nothing, keeping them cheap
+    if parent is _NOOP_SPAN:
+        yield _NOOP_SPAN
+        return
+    if parent is None:
+        if _exporter is None or random.random() >= _sample_rate:
+            noop_token = _current_span.set(_NOOP_SPAN)
+            try:
+                yield _NOOP_SPAN
+            finally:
+                _current_span.reset(noop_token)
+            return
+        new_span = Span(name=name, trace_id=uuid4().hex, parent_id=None, sampled=True)
+    else:
+        new_span = Span(
+            name=name,
+            trace_id=parent.trace_id,
+            parent_id=parent.span_id,
+            sampled=parent.sampled,
+        )
+    event_channel_type = _channel_type.get()
+    if event_channel_type is not None:
+        new_span.set_attribute("channel.type", event_channel_type)
+    for key, value in attributes.items():
+        new_span.set_attribute(key, value)
+
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.status = "error"
+        new_span.set_attribute("error", repr(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.end()
+        if new_span.sampled and _exporter is not None:
+            try:
+                _exporter.export(new_span)
+            except Exception as e:
+                log.error(f"Failed to export span {new_span.name}: {e}")
+
+
+def traced_event(
+    name: str,
+) -> Callable[
+    [Callable[..., Coroutine[Any, Any, R]]], Callable[..., Coroutine[Any, Any, R]]
+]:
+    """
+    A decorator for Bolt listeners that opens a root span per event. Bolt resolves listener
+    arguments by name, functools.wraps keeps the original signature visible to it.
+    """
+
+    def decorator(
+        func: Callable[..., Coroutine[Any, Any, R]]
+    ) -> Callable[..., Coroutine[Any, Any, R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> R:
+            event = kwargs.get("event") or {}
+            # Child spans pick the channel type up from the context
+            token = _channel_type.set(channel_type(event))
+            try:
+                with span(f"event.{name}") as s:
+                    s.set_attribute("event.type", event.get("type", name))
+                    s.set_attribute("payload.size", len(event.get("text") or ""))
+                    return await func(*args, **kwargs)
+            finally:
+                _channel_type.reset(token)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,67 @@
+import logging
+import time
+
+import aiohttp
+from firedust.types import AsyncAssistant
+from slack_sdk.web.async_client import AsyncWebClient
+
+from slackapp.utils.assistant import load_assistant
+from slackapp.utils.slack import get_bot_user_id, prefetch_channel_names
+from slackapp.utils.tracing import span
+
+log = logging.getLogger("slackapp")
+
+# The shared HTTP session opened by warm-up, closed when the app exits
+_session: aiohttp.ClientSession | None = None
+
+
+async def warm_up(client: AsyncWebClient) -> AsyncAssistant:
+    """
+    Prepares the app before it accepts events:
+        - open a shared HTTP session for Slack calls, reused by every listener
+        - load the assistant into its cache and resolve the bot identity
+        - cache the names of the channels the bot is a member of
+
+    Args:
+        client (AsyncWebClient): The app's Slack client.
+
+    Returns:
+        AsyncAssistant: The loaded assistant.
+    """
+    global _session
+
+    start = time.perf_counter()
+    with span("warmup") as warmup_span:
+        if client.session is None:
+            _session = aiohttp.ClientSession()
+            client.session = _session
+
+        assistant = await load_assistant()
+        bot_user_id = await get_bot_user_id(client)
+        # Channel names are only a cache, a missing scope should not stop the app
+        try:
+            channels = await prefetch_channel_names(client)
+        except Exception as e:
+            log.warning(f"Could not prefetch channel names: {e}")
+            channels = 0
+        warmup_span.set_attribute("channels", channels)
+
+    log.info(
+        f"Warm-up done in {time.perf_counter() - start:.2f}s: bot user {bot_user_id}, {channels} channel names cached"
+    )
+    return assistant
+
+
+async def close_session(client: AsyncWebClient) -> None:
+    """
+    Closes the HTTP session that warm-up attached to the client, if any.
+
+    Args:
+        client (AsyncWebClient): The app's Slack client.
+    """
+    global _session
+    if _session is not None:
+        await _session.close()
+        if client.session is _session:
+            client.session = None
+        _session = None